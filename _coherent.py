@@ -6,7 +6,7 @@ Writer: Shallyn(shallyn.liu@foxmail.com)
 import numpy as np
 from ._datasource import load_data_from_ifo, load_data_from_cache
 from ._datasource.noise import sim_gaussian_from_psd
-from ._core.filter import correlate_real, padinsert, cutinsert
+from ._core.filter import correlate_real, padinsert, cutinsert, fft
 from ._core.skymap import nside2npix, pix2ang, Skymap
 from ._core.utdk import calc_sngl_Gpc_and_shift
 from ._datatypes.strain import CreateEmptySpectrum, gwStrain
@@ -79,14 +79,14 @@ class gwStrainCoherent(object):
         else:
             hinj = hinj
         ret = {}
-        hrtilde = np.fft.rfft(hmatch.real)
-        hitilde = np.fft.rfft(hmatch.imag)
+        hrtilde = fft.rfft(hmatch.real)
+        hitilde = fft.rfft(hmatch.imag)
         hfreq = np.fft.rfftfreq(hmatch.size, 1./self._fs)
         df = hfreq[1] - hfreq[0]
         for strain in self:
             at = strain.ifo_antenna_pattern(ra_inj, de_inj, psi, gps)
             signal = at[0]*hinj.real + at[1]*hinj.imag
-            stilde = np.fft.rfft(signal)
+            stilde = fft.rfft(signal)
             power_vec = strain.psdfun_set(hfreq)
 
             sigmasq_r = 1 * (hrtilde * hrtilde.conjugate() / power_vec).sum() * df
@@ -121,8 +121,8 @@ class gwStrainCoherent(object):
         else:
             hinj = hinj
         ret = {}
-        hrtilde = np.fft.rfft(hmatch.real)
-        hitilde = np.fft.rfft(hmatch.imag)
+        hrtilde = fft.rfft(hmatch.real)
+        hitilde = fft.rfft(hmatch.imag)
         hfreq = np.fft.rfftfreq(hmatch.size, 1./self._fs)
         df = hfreq[1] - hfreq[0]
         stilde_dict = {}
@@ -130,7 +130,7 @@ class gwStrainCoherent(object):
         for strain in self:
             at = strain.ifo_antenna_pattern(ra_inj, de_inj, psi, gps)
             signal = at[0]*hinj.real + at[1]*hinj.imag
-            stilde = np.fft.rfft(signal)
+            stilde = fft.rfft(signal)
             power_vec = strain.psdfun_set(hfreq)
 
             stilde_dict[strain.ifo] = stilde
@@ -176,8 +176,8 @@ class gwStrainCoherent(object):
         else:
             hinj = hinj
         distance = tmpl_inj.distance
-        hrtilde = np.fft.rfft(hmatch.real)
-        hitilde = np.fft.rfft(hmatch.imag)
+        hrtilde = fft.rfft(hmatch.real)
+        hitilde = fft.rfft(hmatch.imag)
         hfreq = np.fft.rfftfreq(hmatch.size, 1./self._fs)
         df = hfreq[1] - hfreq[0]
         ret = {}
@@ -192,7 +192,7 @@ class gwStrainCoherent(object):
         for strain in self:
             at = strain.ifo_antenna_pattern(ra_inj, de_inj, psi, gps)
             signal = at[0]*hinj.real + at[1]*hinj.imag
-            stilde = np.fft.rfft(signal)
+            stilde = fft.rfft(signal)
             power_vec = strain.psdfun_set(hfreq)
             tmp = 4*np.sum(np.power(hfreq[kmin:], -7/3) / power_vec[kmin:]) * df
             horizon = A_1_Mpc * np.sqrt(tmp) * 8
@@ -265,7 +265,7 @@ class gwStrainCoherent(object):
         if trange is None:
             sback = min(gps_trigger - self._epoch, DEFAULT_SBACK)
             sfwd = min(self._epoch + self._duration - gps_trigger, DEFAULT_SFWD)
-        elif isinstance(trange, np.float) or isinstance(trange, np.int):
+        elif isinstance(trange, (int, float, np.integer, np.floating)):
             sback = sfwd = trange
         else:
             sback, sfwd = trange
@@ -273,8 +273,8 @@ class gwStrainCoherent(object):
             raise Exception(f'Invalid trange: ({sback}, {sfwd})')
         geocent_times = np.arange(gps_trigger - sback, gps_trigger + sfwd, 1./self._fs)
         ntime = len(geocent_times)
-        Gpc_matrix = np.zeros([npix, ndet, 2], np.float)
-        snr_matrix = np.zeros([ntime, npix, ndet], np.complex)
+        Gpc_matrix = np.zeros([npix, ndet, 2], float)
+        snr_matrix = np.zeros([ntime, npix, ndet], complex)
         retSNR = []
 
         for i, strain in enumerate(self):
@@ -290,7 +290,7 @@ class gwStrainCoherent(object):
         u_matrix = np.zeros([ntime, npix, ndet, ndet], u.dtype)
         u_matrix[:] = u
         ndet = u_matrix.shape[-1]
-        utdk = np.zeros([ntime, npix, ndet, ndet], np.complex)
+        utdk = np.zeros([ntime, npix, ndet, ndet], complex)
         for i in range(u.shape[-1]):
             utdk[:,:,:,i]  = np.multiply(u_matrix[:,:,:,i], snr_matrix)
         utdk = np.sum(utdk, axis = 2)
@@ -318,7 +318,7 @@ class gwStrainCoherent(object):
         if trange is None:
             sback = np.min(gps_trigger - self._epoch, DEFAULT_SBACK)
             sfwd = np.min(self._epoch + self._duration - gps_trigger, DEFAULT_SFWD)
-        elif isinstance(trange, np.float) or isinstance(trange, np.int):
+        elif isinstance(trange, (int, float, np.integer, np.floating)):
             sback = sfwd = trange
         else:
             sback, sfwd = trange
@@ -327,6 +327,8 @@ class gwStrainCoherent(object):
         geocent_times = np.arange(gps_trigger - sback, gps_trigger + sfwd, 1./self._fs)
 
         retSPEC = [CreateEmptySpectrum(strain.ifo, info = None) for strain in self]
+        snrs = [[] for strain in self]
+        epochs = [[] for strain in self]
         frequencies = []
         for shift, qtile in tmpl.iter_fftQPlane(q = q, 
                                                 duration = self._duration,
@@ -344,14 +346,16 @@ class gwStrainCoherent(object):
                 df = self._fs / strain.size
                 snr_r = correlate_real(stilde, hrwindowed, power_vec, df)
                 snr_i = correlate_real(stilde, hiwindowed, power_vec, df)
-                snr = snr_r + 1.j*snr_i
-                retSPEC[i].append(snr, freq, epoch=strain.epoch+shift, fs=self._fs)
+                snrs[i].append(snr_r + 1.j*snr_i)
+                epochs[i].append(strain.epoch + shift)
+        for i, spec in enumerate(retSPEC):
+            spec.extend(snrs[i], frequencies, epochs[i], fs=self._fs)
         frequencies = np.asarray(frequencies)
         ndet = len(self)
         ntime = len(geocent_times)
         nfreq = len(frequencies)
-        Gpc_matrix = np.zeros([ndet, 2], np.float)
-        spec_matrix = np.zeros([nfreq, ntime, ndet], np.complex)
+        Gpc_matrix = np.zeros([ndet, 2], float)
+        spec_matrix = np.zeros([nfreq, ntime, ndet], complex)
         for i, strain in enumerate(self):
             ar, delay = strain.ifo_get_at_and_delay(ra, de, 0, gps_trigger)
             Gpc_matrix[i,0] = ar[0] * np.sqrt(strain.sigma2)
@@ -360,7 +364,7 @@ class gwStrainCoherent(object):
         u,s,v = np.linalg.svd(Gpc_matrix)
         u_matrix = np.zeros([nfreq, ntime, ndet, ndet], u.dtype)
         u_matrix[:,:] = u
-        coh = np.zeros([nfreq, ntime, ndet, ndet], np.complex)
+        coh = np.zeros([nfreq, ntime, ndet, ndet], complex)
         for i in range(ndet):
             coh[:,:,:,i] = np.multiply(u_matrix[:,:,:,i], spec_matrix)
         coh = np.sum(coh, axis=2)
@@ -3,9 +3,9 @@ This is the module for gravitational wave coherent search.
 Writer: Shallyn(shallyn.liu@foxmail.com)
 """
 
-from .filter import resample
+from .filter import resample, Resampler
 from .qplane import QPlane
 from . import filter
 from . import utdk
 
-__all__ = ['resample', 'QPlane', 'filter', 'utdk']
+__all__ = ['resample', 'Resampler', 'QPlane', 'filter', 'utdk']
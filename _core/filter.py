@@ -4,19 +4,77 @@ Writer: Shallyn(shallyn.liu@foxmail.com)
 """
 
 import numpy as np
-from scipy.signal import resample as scipy_resample
+from fractions import Fraction
+from functools import lru_cache
+from scipy.signal import resample_poly, firwin
 import matplotlib.mlab as mlab
 from scipy.interpolate import interp1d
 
+# pyFFTW keeps the FFTW plans of recent transform sizes alive, so the
+# repeated same-length (i)rfft in matched filtering reuse them.
+try:
+    import pyfftw
+    from pyfftw.interfaces import numpy_fft as fft
+    pyfftw.interfaces.cache.enable()
+    pyfftw.interfaces.cache.set_keepalive_time(60)
+    PYFFTW = True
+except ImportError:
+    fft = np.fft
+    PYFFTW = False
 
-def resample(data, fs_old, fs_new):
+
+def resample(data, fs_old, fs_new, axis = -1):
+    """
+    Polyphase resampling along axis, 2D data are resampled
+    row by row in a single call.
+    """
     if fs_new != fs_old:
-        nsamp = int(len(data) * fs_new / fs_old)
-        new = scipy_resample(data, nsamp)
-        return new
+        return Resampler(fs_old, fs_new)(data, axis = axis)
     else:
         return data
 
+def get_resample_ratio(fs_old, fs_new):
+    ratio = Fraction(float(fs_new)).limit_denominator(1000) / \
+            Fraction(float(fs_old)).limit_denominator(1000)
+    return ratio.numerator, ratio.denominator
+
+@lru_cache(maxsize = 32)
+def _get_resampler(fs_old, fs_new):
+    # Same anti-aliasing FIR as the resample_poly default
+    up, down = get_resample_ratio(fs_old, fs_new)
+    if up == down:
+        return up, down, None
+    max_rate = max(up, down)
+    h = firwin(2 * 10 * max_rate + 1, 1. / max_rate, window = ('kaiser', 5.0))
+    h.flags.writeable = False
+    return up, down, h
+
+class Resampler(object):
+    """
+    Resampler between two fixed rates, the FIR filter is designed
+    once and shared by all calls with the same rates.
+    """
+    def __init__(self, fs_old, fs_new):
+        self._fs_old = fs_old
+        self._fs_new = fs_new
+        self._up, self._down, self._h = _get_resampler(fs_old, fs_new)
+
+    @property
+    def fs_old(self):
+        return self._fs_old
+
+    @property
+    def fs_new(self):
+        return self._fs_new
+
+    def __call__(self, data, axis = -1):
+        if self._h is None:
+            return data
+        # Extrapolate the trend at the edges instead of zero padding, so
+        # offset data such as gps time tracks keep their endpoints
+        return resample_poly(data, self._up, self._down, axis = axis,
+                             window = self._h, padtype = 'line')
+
 def whiten(strain, interp_psd, fs):
     Nt = len(strain)
     freqs = np.fft.rfftfreq(Nt, 1./fs)
@@ -25,10 +83,10 @@ def whiten(strain, interp_psd, fs):
     
     # whitening: transform to freq domain, divide by asd, then transform back, 
     # taking care to get normalization right.
-    hf = np.fft.rfft(strain)
+    hf = fft.rfft(strain)
     #norm = 1./np.sqrt(fs/2)
     white_hf = hf / np.sqrt(interp_psd(np.abs(freqs)))# * norm
-    white_ht = np.fft.irfft(white_hf, n=Nt)
+    white_ht = fft.irfft(white_hf, n=Nt)
     sigmasq = 4 * (hf * hf.conjugate() / interp_psd(freqs)).sum() * df
     return white_ht, sigmasq
 
@@ -67,5 +125,5 @@ def cutinsert(a,b,cutpct = None):
 def correlate_real(stilde, htilde, power_vec, df):
     sigmasq = 1 * (htilde * htilde.conjugate() / power_vec).sum() * df
     corr = 1 * stilde * htilde.conjugate() / power_vec
-    corr_time = np.fft.irfft(corr) / np.sqrt(np.abs(sigmasq))
+    corr_time = fft.irfft(corr) / np.sqrt(np.abs(sigmasq))
     return corr_time
@@ -33,10 +33,10 @@ def isnsideok(nside, nest=False):
         if not isinstance(nside, np.ndarray):
             nside = np.asarray(nside)
         is_nside_ok = (
-            (nside == nside.astype(np.int)) & (nside > 0) & (nside <= max_nside)
+            (nside == nside.astype(int)) & (nside > 0) & (nside <= max_nside)
         )
         if nest:
-            is_nside_ok &= (nside.astype(np.int) & (nside.astype(np.int) - 1)) == 0
+            is_nside_ok &= (nside.astype(int) & (nside.astype(int) - 1)) == 0
     else:
         is_nside_ok = nside == int(nside) and 0 < nside <= max_nside
         if nest:
@@ -346,10 +346,10 @@ class LogNorm2(matplotlib.colors.Normalize):
 
         if matplotlib.cbook.iterable(value):
             vtype = "array"
-            val = np.ma.asarray(value).astype(np.float)
+            val = np.ma.asarray(value).astype(float)
         else:
             vtype = "scalar"
-            val = np.ma.array([value]).astype(np.float)
+            val = np.ma.array([value]).astype(float)
 
         val = np.ma.masked_where(np.isinf(val.data), val)
 
@@ -404,10 +404,10 @@ class HistEqNorm(matplotlib.colors.Normalize):
 
         if matplotlib.cbook.iterable(value):
             vtype = "array"
-            val = np.ma.asarray(value).astype(np.float)
+            val = np.ma.asarray(value).astype(float)
         else:
             vtype = "scalar"
-            val = np.ma.array([value]).astype(np.float)
+            val = np.ma.array([value]).astype(float)
 
         self.autoscale_None(val)
 
@@ -469,8 +469,8 @@ class HistEqNorm(matplotlib.colors.Normalize):
             w = w | data.mask
         data2 = data.data[~w]
         if data2.size < 3:
-            self.yval = np.array([0, 1], dtype=np.float)
-            self.xval = np.array([self.vmin, self.vmax], dtype=np.float)
+            self.yval = np.array([0, 1], dtype=float)
+            self.xval = np.array([self.vmin, self.vmax], dtype=float)
             return
         bins = min(data2.size // 20, 5000)
         if bins < 3:
@@ -486,7 +486,7 @@ class HistEqNorm(matplotlib.colors.Normalize):
         if bins.size == hist.size + 1:
             # new bins format, remove last point
             bins = bins[:-1]
-        hist = hist.astype(np.float) / np.float(hist.sum())
+        hist = hist.astype(float) / float(hist.sum())
         self.yval = np.concatenate([[0.0], hist.cumsum(), [1.0]])
         self.xval = np.concatenate(
             [[self.vmin], bins + 0.5 * (bins[1] - bins[0]), [self.vmax]]
@@ -495,10 +495,10 @@ class HistEqNorm(matplotlib.colors.Normalize):
     def _lininterp(self, x, X, Y):
         if hasattr(x, "__len__"):
             xtype = "array"
-            xx = np.asarray(x).astype(np.float)
+            xx = np.asarray(x).astype(float)
         else:
             xtype = "scalar"
-            xx = np.asarray([x]).astype(np.float)
+            xx = np.asarray([x]).astype(float)
         idx = X.searchsorted(xx)
         yy = xx * 0
         yy[idx > len(X) - 1] = Y[-1]  # over
@@ -530,10 +530,10 @@ class LinNorm2(matplotlib.colors.Normalize):
 
         if matplotlib.cbook.iterable(value):
             vtype = "array"
-            val = np.ma.asarray(value).astype(np.float)
+            val = np.ma.asarray(value).astype(float)
         else:
             vtype = "scalar"
-            val = np.ma.array([value]).astype(np.float)
+            val = np.ma.array([value]).astype(float)
 
         winf = np.isinf(val.data)
         val = np.ma.masked_where(winf, val)
@@ -24,7 +24,7 @@ def calc_sngl_Gpc_and_shift(gwSNR, times, ra_pix, de_pix, gps_geocent):
 def calc_sngl_Gpc_and_shift_python(gwSNR, times, ra_pix, de_pix, gps_geocent):
     ntime = len(times)
     npix = len(ra_pix)
-    Gpc_sngl = np.zeros([npix, 2], np.float)
+    Gpc_sngl = np.zeros([npix, 2], float)
     snr_sngl = np.zeros([ntime, npix], gwSNR.value.dtype)
     fitp = interp1d_complex(gwSNR.time, gwSNR.value)
     remarks = f'Calculating Gpc:{gwSNR.ifo}'
@@ -3,11 +3,12 @@ This is the module for gravitational wave coherent search.
 Writer: Shallyn(shallyn.liu@foxmail.com)
 """
 
-from .series import TimeSeries, TimeFreqSpectrum
+from .series import TimeSeries, TimeFreqSpectrum, resample_many
 from .strain import gwStrain
 from .detector import Detector
 
 __all__ = ['TimeSeries',
            'gwStrain',
            'Detector',
-           'TimeFreqSpectrum']
+           'TimeFreqSpectrum',
+           'resample_many']
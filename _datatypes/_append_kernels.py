@@ -0,0 +1,55 @@
+"""
+This is the module for gravitational wave coherent search.
+Writer: Shallyn(shallyn.liu@foxmail.com)
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA = True
+except ImportError:
+    NUMBA = False
+
+
+def _insert_sorted_loop(array, y_arr, epoch_arr, nrows, row, y, epoch):
+    idx = np.searchsorted(y_arr[:nrows], y)
+    if idx < nrows and y_arr[idx] == y:
+        array[idx] = row
+        epoch_arr[idx] = epoch
+        return nrows
+    for i in range(nrows, idx, -1):
+        array[i] = array[i-1]
+        y_arr[i] = y_arr[i-1]
+        epoch_arr[i] = epoch_arr[i-1]
+    array[idx] = row
+    y_arr[idx] = y
+    epoch_arr[idx] = epoch
+    return nrows + 1
+
+def _insert_sorted_slice(array, y_arr, epoch_arr, nrows, row, y, epoch):
+    idx = np.searchsorted(y_arr[:nrows], y)
+    if idx < nrows and y_arr[idx] == y:
+        array[idx] = row
+        epoch_arr[idx] = epoch
+        return nrows
+    array[idx+1:nrows+1] = array[idx:nrows]
+    y_arr[idx+1:nrows+1] = y_arr[idx:nrows]
+    epoch_arr[idx+1:nrows+1] = epoch_arr[idx:nrows]
+    array[idx] = row
+    y_arr[idx] = y
+    epoch_arr[idx] = epoch
+    return nrows + 1
+
+# insert_sorted(array, y_arr, epoch_arr, nrows, row, y, epoch)
+#   Insert row at y into the first nrows rows of the buffers keeping y_arr
+#   sorted, or overwrite the row if y already exists. Buffers must have room
+#   for nrows + 1 rows. Return the new number of rows.
+if NUMBA:
+    insert_sorted = njit(cache = True)(_insert_sorted_loop)
+    # Pay the JIT cost at import for the usual real and complex spectra
+    for _dtype in (np.float64, np.complex128):
+        insert_sorted(np.zeros((2, 1), _dtype), np.zeros(2), np.zeros(2), 0,
+                      np.zeros(1, _dtype), 0., 0.)
+else:
+    insert_sorted = _insert_sorted_slice
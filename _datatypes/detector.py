@@ -26,7 +26,7 @@ class ifoinfo(object):
         self.longtitude = longtitude
     
     def setARMResponse(self, xdx, xdy, xdz, ydx, ydy, ydz):
-        response = np.zeros([3,3], np.float)
+        response = np.zeros([3,3], float)
         response[0,0] = (xdx **2 - ydx **2)/2
         response[0,1] = (xdx*xdy - ydx*ydy)/2
         response[0,2] = (xdx*xdz - ydx*ydz)/2
@@ -107,7 +107,7 @@ class Detector(object):
     def time_delay_from_earth_center(self, ra, de, gps):
         gcloc = np.array([0,0,0])
         gha = gmst_accurate(gps) - ra
-        ehat_src = np.zeros(3, np.float)
+        ehat_src = np.zeros(3, float)
         ehat_src[0] = np.cos(de) * np.cos(gha)
         ehat_src[1] = np.cos(de) * (-np.sin(gha))
         ehat_src[2] = np.sin(de)
@@ -118,7 +118,7 @@ class Detector(object):
     def time_delay_from_earth_center_gmst(self, ra, de, gmst):
         gcloc = np.array([0,0,0])
         gha = gmst - ra
-        ehat_src = np.zeros(3, np.float)
+        ehat_src = np.zeros(3, float)
         ehat_src[0] = np.cos(de) * np.cos(gha)
         ehat_src[1] = np.cos(de) * (-np.sin(gha))
         ehat_src[2] = np.sin(de)
@@ -4,25 +4,55 @@ Writer: Shallyn(shallyn.liu@foxmail.com)
 """
 
 import numpy as np
+import copy
 from .._core import resample
 from scipy.signal import resample as scipy_resample
 from scipy.interpolate import interp1d, interp2d
 from .._utils import interp2d_complex, LOGGER
+from ._append_kernels import insert_sorted
 
 import matplotlib.pyplot as plt
 from matplotlib.colors import BoundaryNorm
 from matplotlib.ticker import MaxNLocator
 from matplotlib import gridspec
 
+# Initial row capacity of an empty MultiSeries
+DEFAULT_CAPACITY = 16
+# Rows interpolated at once by TimeFreqSpectrum.interpolate
+INTERP_BLOCK_ROWS = 64
+# Precision of dtype = 'single', and of non-float input
+DEFAULT_REAL_DTYPE = np.float32
+DEFAULT_COMPLEX_DTYPE = np.complex64
+
 
 class Series(object):
-    def __init__(self, value, deltax, info = 'Series'):
-        value = np.asarray(value)
+    """
+    dtype: None keeps a float or complex value as it is and converts other
+        values to float, 'single' picks DEFAULT_REAL_DTYPE or
+        DEFAULT_COMPLEX_DTYPE, anything else is passed to numpy.
+    """
+    __slots__ = ('_value', '_deltax', '_info', '_x_cache')
+
+    def __init__(self, value, deltax, info = 'Series', dtype = None):
+        value = _asarray(value, dtype)
         if (len(value.shape) != 1 and value.shape[0] != 1):
             raise Exception(f'Shape error: {value.shape}')
         self._value = value
         self._deltax = deltax
         self._info = info
+        self._x_cache = None
+
+    @classmethod
+    def _from_view(cls, value, deltax, info = 'Series'):
+        """
+        Wrap a 1D ndarray without the checks of __init__.
+        """
+        obj = cls.__new__(cls)
+        obj._value = value
+        obj._deltax = deltax
+        obj._info = info
+        obj._x_cache = None
+        return obj
     
     @property
     def value(self):
@@ -36,7 +66,13 @@ class Series(object):
         return len(self._value)
 
     def __abs__(self):
-        return abs(self._value)
+        return Series._from_view(np.abs(self._value), self._deltax, info = f'Abs_{self._info}')
+
+    def abs_into(self, out):
+        """
+        |value| written into the preallocated ndarray out.
+        """
+        return np.abs(self._value, out = out)
 
     @property
     def size(self):
@@ -44,7 +80,14 @@ class Series(object):
     
     @property
     def x(self):
-        return np.arange(0, self.length, self._deltax)
+        """
+        Read-only, computed once. Build a new Series instead of
+        changing _deltax, as resample does.
+        """
+        if self._x_cache is None:
+            self._x_cache = np.arange(len(self)) * self._deltax
+            self._x_cache.flags.writeable = False
+        return self._x_cache
 
     @property
     def length(self):
@@ -52,14 +95,36 @@ class Series(object):
 
     @property
     def real(self):
-        return Series(self._value.real, self._deltax, info = f'Re_{self._info}')
+        return Series._from_view(self._value.real, self._deltax, info = f'Re_{self._info}')
 
     @property
     def imag(self):
-        return Series(self._value.imag, self._deltax, info = f'Im_{self._info}')
+        return Series._from_view(self._value.imag, self._deltax, info = f'Im_{self._info}')
+
+    def real_into(self, out):
+        """
+        Real part copied into the preallocated ndarray out.
+        """
+        np.copyto(out, self._value.real)
+        return out
+
+    def imag_into(self, out):
+        """
+        Imaginary part copied into the preallocated ndarray out.
+        """
+        np.copyto(out, self._value.imag)
+        return out
 
     def conjugate(self):
-        return Series(self._value.conjugate(), self._deltax, info = f'Conj_{self._info}')
+        return Series._from_view(self._value.conjugate(), self._deltax, info = f'Conj_{self._info}')
+
+    def conjugate_inplace(self):
+        """
+        Negate the imaginary part in place, no new buffer is allocated.
+        """
+        if np.iscomplexobj(self._value):
+            np.negative(self._value.imag, out = self._value.imag)
+        return self
 
     def __str__(self):
         return f'{self._info}: {self._value}'
@@ -71,11 +136,10 @@ class Series(object):
         return self.__str__()
     
     def __iter__(self):
-        for x in self._value:
-            yield x
+        return iter(self._value.tolist())
 
     def __getitem__(self, key):
-        if isinstance(key, np.int):
+        if isinstance(key, (int, np.integer)):
             return self._value[key]
         return self._getslice(key)
 
@@ -88,17 +152,17 @@ class Series(object):
                 new_deltax = self.deltax * index.step
             else:
                 new_deltax = self.deltax
-            return Series(self._value[index], deltax = new_deltax)
+            return Series._from_view(self._value[index], new_deltax)
         if isinstance(index, np.ndarray):
-            if len(index) == 1:
-                return self._value[index]
-            # Check uniform
-            grad = np.gradient(index)
-            if max(grad) != min(grad):
-                raise ValueError(f'Invalid index for Series: {index}')
+            n = len(index)
+            if n <= 1:
+                return Series._from_view(self._value[index], self._deltax)
             step = index[1] - index[0]
+            # Check uniform, one or two indexes always are
+            if n > 2 and not np.array_equal(index, index[0] + step * np.arange(n)):
+                raise ValueError(f'Invalid index for Series: {index}')
             new_deltax = self._deltax * step
-            return Series(self._value[index], deltax = new_deltax)
+            return Series._from_view(self._value[index], new_deltax)
 
     
     def __setitem__(self, key, val):
@@ -107,23 +171,43 @@ class Series(object):
     def resample(self, new_deltax):
         if new_deltax != self.deltax:
             new = resample(self.value, 1./self.deltax, 1./new_deltax)
-            return Series(new, new_deltax, info = self._info)
+            return Series(new, new_deltax, info = self._info, dtype = self._value.dtype)
         else:
             return self
 
 
 class TimeSeries(Series):
-    def __init__(self, value, epoch, fs, info = 'TimeSeries'):
-        super(TimeSeries, self).__init__(value, 1./fs, info = info)
+    __slots__ = ('_epoch', '_time_cache')
+
+    def __init__(self, value, epoch, fs, info = 'TimeSeries', dtype = None):
+        super(TimeSeries, self).__init__(value, 1./fs, info = info, dtype = dtype)
         self._epoch = epoch
+        self._time_cache = None
+
+    @classmethod
+    def _from_row(cls, value, epoch, deltax, info = 'TimeSeries'):
+        """
+        Wrap a row of a TimeFreqSpectrum without the checks of __init__.
+        """
+        obj = cls._from_view(value, deltax, info = info)
+        obj._epoch = epoch
+        obj._time_cache = None
+        return obj
     
     @property
     def fs(self):
-        return int(1./self._deltax)
+        return int(round(1./self._deltax))
     
     @property
     def time(self):
-        return self._epoch + self.x
+        """
+        Read-only, computed once. Build a new TimeSeries instead of
+        changing _epoch or _deltax, as resample does.
+        """
+        if self._time_cache is None:
+            self._time_cache = self._epoch + self.x
+            self._time_cache.flags.writeable = False
+        return self._time_cache
     
     @property
     def duration(self):
@@ -134,9 +218,9 @@ class TimeSeries(Series):
         return self._epoch
     
     def resample(self, fs_new):
-        if fs_new != self.fs:
-            new = resample(self.value, self.fs, fs_new)
-            return TimeSeries(new, epoch=self.epoch, fs=self.fs, info=self.info)
+        if fs_new != 1./self._deltax:
+            new = resample(self.value, 1./self._deltax, fs_new)
+            return TimeSeries(new, epoch=self.epoch, fs=fs_new, info=self._info, dtype=self._value.dtype)
         else:
             return self
 
@@ -176,7 +260,11 @@ class TimeSeries(Series):
     
 
 class MultiSeries(object):
+    __slots__ = ('_array', '_deltax', '_y', '_isempty',
+                 '_arraybuf', '_ybuf', '_nrows', '_capacity', '_x_cache')
+
     def __init__(self, array, deltax, y):
+        self._x_cache = None
         array = np.asarray(array)
         if len(array.shape) == 1:
             if array.shape[0] > 0:
@@ -190,9 +278,10 @@ class MultiSeries(object):
         self._array = array
         if not self._isempty:
             self._deltax = deltax
-            if isinstance(y, np.int) or isinstance(y, np.float):
+            if isinstance(y, (int, float, np.integer, np.floating)):
                 y = [y]
             y = np.asarray(y)
+            y = y.astype(_label_dtype(None, y), copy = False)
             if len(y) > 0:
                 if (len(y.shape) != 1 and y.shape[0] != 1):
                     raise Exception(f'Shape error for y: {y.shape}')
@@ -201,9 +290,118 @@ class MultiSeries(object):
                 self._y = y.reshape(y.size)
             else:
                 raise Exception(f'Invalid variable: {y}')
+            self._arraybuf = self._array
+            self._ybuf = self._y
+            self._nrows = self._capacity = self._y.size
         else:
             self._deltax = None
             self._y = None
+            self._arraybuf = None
+            self._ybuf = None
+            self._nrows = self._capacity = 0
+
+    @property
+    def _order(self):
+        return 'C'
+
+    # Rows are kept in preallocated buffers (_arraybuf, _ybuf) whose capacity
+    # doubles on overflow, _array and _y are views of the first _nrows rows.
+    def _sync(self):
+        self._array = self._arraybuf[:self._nrows]
+        self._y = self._ybuf[:self._nrows]
+
+    def _alloc(self, value, y):
+        self._capacity = DEFAULT_CAPACITY
+        self._arraybuf = np.empty((self._capacity, value.size), dtype = value.dtype, order = self._order)
+        self._ybuf = np.empty(self._capacity)
+        self._nrows = 0
+
+    def _grow(self):
+        capacity = 2 * self._capacity
+        arraybuf = np.empty((capacity, self._arraybuf.shape[1]), dtype = self._arraybuf.dtype, order = self._order)
+        arraybuf[:self._nrows] = self._arraybuf[:self._nrows]
+        ybuf = np.empty(capacity, dtype = self._ybuf.dtype)
+        ybuf[:self._nrows] = self._ybuf[:self._nrows]
+        self._arraybuf = arraybuf
+        self._ybuf = ybuf
+        self._capacity = capacity
+
+    def _insert(self, idx, value, y):
+        if self._nrows == self._capacity:
+            self._grow()
+        n = self._nrows
+        self._arraybuf[idx+1:n+1] = self._arraybuf[idx:n]
+        self._ybuf[idx+1:n+1] = self._ybuf[idx:n]
+        self._arraybuf[idx] = value
+        self._ybuf[idx] = y
+        self._nrows += 1
+        self._sync()
+
+    def _check_extend(self, array, y, deltax):
+        array = np.asarray(array)
+        y = np.asarray(y).reshape(-1)
+        if y.size == 0:
+            return array, y
+        if len(array.shape) != 2 or array.shape[0] != y.size:
+            raise Exception(f'Incompatible shape: {array.shape}, {y.shape}')
+        if not self._isempty:
+            if array.shape[1] != self.xsize:
+                raise Exception(f'Incompatible size: {array.shape[1]} != {self.xsize}')
+            if deltax is not None and deltax != self.deltax:
+                raise Exception(f'Incompatible deltax: {deltax} != {self.deltax}')
+        elif deltax is None:
+            raise Exception(f'deltax is required for empty {type(self).__name__}')
+        return array, y
+
+    def _gather(self, perm, array, y, deltax):
+        old = None if self._isempty else self._array
+        self._arraybuf = _take_rows(old, array, perm, order = self._order)
+        self._ybuf = _take_rows(self._y, y, perm, dtype = _label_dtype(self._y, y))
+        self._nrows = self._capacity = perm.size
+        if self._isempty:
+            self._deltax = deltax
+            self._isempty = False
+        self._sync()
+
+    def extend(self, array, y, deltax = None):
+        """
+        Insert rows of 2D array at y in one pass,
+        rows with an existing y overwrite the old ones as in append.
+        """
+        array, y = self._check_extend(array, y, deltax)
+        if y.size == 0:
+            return
+        perm = _merge_order(self._y, y)
+        self._gather(perm, array, y, deltax)
+
+    def _copy_with(self, array, deltax):
+        new = copy.copy(self)
+        new._x_cache = None
+        new._arraybuf = np.asarray(array, order = self._order)
+        new._ybuf = self._y.copy()
+        new._nrows = new._capacity = self._nrows
+        new._deltax = deltax
+        new._sync()
+        return new
+
+    def resample(self, new_deltax):
+        if self._isempty or new_deltax == self._deltax:
+            return self
+        array = resample(self._array, 1./self._deltax, 1./new_deltax, axis = 1)
+        array = array.astype(self._array.dtype, copy = False)
+        return self._copy_with(array, new_deltax)
+
+    def finalize(self):
+        """
+        Release the spare capacity of the row buffers,
+        return the filled 2D array.
+        """
+        if self._capacity > self._nrows:
+            self._arraybuf = self._array.copy(order = self._order)
+            self._ybuf = self._y.copy()
+            self._capacity = self._nrows
+            self._sync()
+        return self._array
     
     @property
     def array(self):
@@ -219,7 +417,10 @@ class MultiSeries(object):
 
     @property
     def x(self):
-        return np.arange(0, self.length, self._deltax)
+        if self._x_cache is None:
+            self._x_cache = np.arange(self.xsize) * self._deltax
+            self._x_cache.flags.writeable = False
+        return self._x_cache
 
     def __len__(self):
         return self.shape[1]
@@ -245,55 +446,135 @@ class MultiSeries(object):
         return self._array.shape
 
     def __iter__(self):
-        for i in range(self.ysize):
-            yield (self.y[i], Series(self._array[i,:], self.deltax))
+        if self._isempty:
+            return
+        for i, y in enumerate(self._y.tolist()):
+            yield (y, Series(self._array[i,:], self.deltax))
 
     def append(self, series, y):
-        if not isinstance(series, Series):
-            series = Series(series, self.deltax)
+        if not self._isempty and _is_row_of(series, self._array):
+            # Raw row matching the buffer, no Series or checks needed
+            value = series
+        else:
+            if not isinstance(series, Series):
+                series = Series(series, self.deltax)
+            if not self._isempty:
+                if len(series) != self.xsize:
+                    raise Exception(f'Incompatible size: {series.size} != {self.xsize}')
+                if series.deltax != self.deltax:
+                    raise Exception(f'Incompatible deltax: {series.deltax} != {self.deltax}')
+            value = series.value
         if not self._isempty:
-            if len(series) != self.xsize:
-                raise Exception(f'Incompatible size: {series.size} != {self.xsize}')
-            if series.deltax != self.deltax:
-                raise Exception(f'Incompatible deltax: {series.deltax} != {self.deltax}')
-            if y > self._y[-1]:
-                idx_insert = self.ysize
-                self._array = np.insert(self._array, idx_insert, series.value, axis=0)
-                self._y = np.insert(self._y, idx_insert, y)
+            idx_insert = int(np.searchsorted(self._y, y))
+            if idx_insert < self._nrows and self._y[idx_insert] == y:
+                self._array[idx_insert,:] = value
             else:
-                idx_insert = np.where(self._y - y >= 0)[0][0]
-                if self._y[idx_insert] == y:
-                    self._array[idx_insert,:] = series.value
-                else:
-                    self._array = np.insert(self._array, idx_insert, series.value, axis=0)
-                    self._y = np.insert(self._y, idx_insert, y)
+                self._insert(idx_insert, value, y)
         else:
-            size = series.size
             self._deltax = series.deltax
-            self._array = series.value.reshape(1, size)
-            if not isinstance(y, np.int) or not isinstance(y, np.float):
+            if not isinstance(y, (int, float, np.integer, np.floating)):
                 raise TypeError(f'Invalid type: {type(y)}')
-            self._y = np.array([y])
+            self._alloc(value, y)
+            self._insert(0, value, y)
+            self._isempty = False
 
 
 
     
 class TimeFreqSpectrum(MultiSeries):
-    def __init__(self, array, epoch, fs, freqs, info = 'TimeFreqSpectrum'):
+    """
+    layout: 'row' stores the (freq x time) array C-ordered for scanning
+        one frequency across time, 'col' stores it F-ordered for scanning
+        all frequencies at one time.
+    """
+    __slots__ = ('_epoch', '_epochbuf', '_info', '_layout', '_times_cache')
+
+    def __init__(self, array, epoch, fs, freqs, info = 'TimeFreqSpectrum', layout = 'row'):
+        if layout not in ('row', 'col'):
+            raise ValueError(f'Invalid layout: {layout}')
+        self._layout = layout
+        self._times_cache = None
         super(TimeFreqSpectrum, self).__init__(array, 1./fs, freqs)
         self._info = info
         if not self._isempty:
-            if isinstance(epoch, np.int) or isinstance(epoch, np.float):
+            self._array = self._arraybuf = np.asarray(self._array, order = self._order)
+            if isinstance(epoch, (int, float, np.integer, np.floating)):
                 epoch = [epoch]
             epoch = np.asarray(epoch)
+            epoch = epoch.astype(_label_dtype(None, epoch), copy = False)
             if len(epoch) == 1:
                 self._epoch = np.ones(self.ysize) * epoch[0]
             elif len(epoch) == self.ysize:
                 self._epoch = epoch
             else:
                 raise Exception(f'Incompatible shape for epoch: {epoch.shape}')
+            self._epochbuf = self._epoch
         else:
-            epoch = None
+            self._epoch = None
+            self._epochbuf = None
+
+    @property
+    def _order(self):
+        return 'C' if self._layout == 'row' else 'F'
+
+    @property
+    def layout(self):
+        return self._layout
+
+    def as_arrays(self):
+        """
+        (frequencies, epoch, array) without copy, for vectorized access
+        instead of iterating TimeSeries rows. With layout = 'col' the spare
+        capacity is released first so that the array is F-contiguous.
+        """
+        if self._layout == 'col':
+            self.finalize()
+        return self._y, self._epoch, self._array
+
+    def _sync(self):
+        super(TimeFreqSpectrum, self)._sync()
+        self._epoch = self._epochbuf[:self._nrows]
+        self._times_cache = None
+
+    def _alloc(self, value, freq):
+        super(TimeFreqSpectrum, self)._alloc(value, freq)
+        self._epochbuf = np.empty(self._capacity)
+
+    def _grow(self):
+        epochbuf = np.empty(2 * self._capacity, dtype = self._epochbuf.dtype)
+        epochbuf[:self._nrows] = self._epochbuf[:self._nrows]
+        self._epochbuf = epochbuf
+        super(TimeFreqSpectrum, self)._grow()
+
+    def extend(self, array, freqs, epochs, fs = None):
+        """
+        Insert rows of 2D array at freqs in one pass,
+        epochs is a scalar or one epoch per row.
+        """
+        deltax = None if fs is None else 1./fs
+        array, freqs = self._check_extend(array, freqs, deltax)
+        if freqs.size == 0:
+            return
+        epochs = np.broadcast_to(np.asarray(epochs, dtype = float), freqs.shape)
+        perm = _merge_order(self._y, freqs)
+        self._epochbuf = _take_rows(self._epoch, epochs, perm,
+                                    dtype = _label_dtype(self._epoch, epochs))
+        self._gather(perm, array, freqs, deltax)
+
+    def _copy_with(self, array, deltax):
+        new = super(TimeFreqSpectrum, self)._copy_with(array, deltax)
+        new._epochbuf = self._epoch.copy()
+        new._sync()
+        return new
+
+    def resample(self, fs_new):
+        return super(TimeFreqSpectrum, self).resample(1./fs_new)
+
+    def finalize(self):
+        if self._capacity > self._nrows:
+            self._epochbuf = self._epoch.copy()
+        return super(TimeFreqSpectrum, self).finalize()
+
     @property
     def epoch(self):
         return self._epoch
@@ -306,7 +587,13 @@ class TimeFreqSpectrum(MultiSeries):
 
     @property
     def times(self):
-        return np.arange(self.trange[0], self.trange[1], self._deltax)
+        """
+        Read-only, recomputed after rows are appended.
+        """
+        if self._times_cache is None:
+            self._times_cache = np.arange(self.trange[0], self.trange[1], self._deltax)
+            self._times_cache.flags.writeable = False
+        return self._times_cache
     
     @property
     def fs(self):
@@ -316,57 +603,78 @@ class TimeFreqSpectrum(MultiSeries):
     def frequencies(self):
         return self.y
 
+    def iter_rows(self):
+        """
+        Yield (freq, epoch, row) where row is a view of the array,
+        for loops that do not need TimeSeries objects.
+        """
+        if self._isempty:
+            return
+        for i, (freq, epoch) in enumerate(zip(self._y.tolist(), self._epoch.tolist())):
+            yield (freq, epoch, self._array[i,:])
+
     def __iter__(self):
-        for i in range(self.ysize):
-            yield (self.frequencies[i], TimeSeries(self._array[i,:], self.epoch[i], self.fs, info = self._info))
+        for freq, epoch, row in self.iter_rows():
+            yield (freq, TimeSeries._from_row(row, epoch, self._deltax, info = self._info))
         
     def append(self, timeseries, freq, epoch = None, fs = None):
-        if not isinstance(timeseries, TimeSeries) and epoch is None:
-            raise TypeError(f'Invalid type: {timeseries}')
-        elif epoch is not None and isinstance(timeseries, np.ndarray):
+        if not self._isempty and epoch is not None and _is_row_of(timeseries, self._array) and \
+                (fs is None or 1./fs == self._deltax):
+            # Raw row matching the buffer, no conversion or checks needed
             value = timeseries
-            if fs is None:
-                deltax = self.deltax
-            else:
-                deltax = 1./fs
-            size = value.size
+            if self._nrows == self._capacity:
+                self._grow()
         else:
-            value = timeseries.value
-            epoch = timeseries.epoch
-            deltax = timeseries.deltax
-            size = timeseries.size
-            
-
-        if not self._isempty:
-            if size != self.xsize:
-                raise Exception(f'Incompatible size: {timeseries.size} != {self.xsize}')
-            if deltax != self.deltax:
-                raise Exception(f'Incompatible deltax: {timeseries.deltax} != {self.deltax}')
-            if freq > self._y[-1]:
-                idx_insert = self.ysize
-                self._array = np.insert(self._array, idx_insert, value, axis=0)
-                self._epoch = np.insert(self._epoch, idx_insert, epoch)
-                self._y = np.insert(self._y, idx_insert, freq)
-            else:
-                idx_insert = np.where(self._y - freq >= 0)[0][0]
-                if self._y[idx_insert] == freq:
-                    self._array[idx_insert, :] = value
-                    self._epoch[idx_insert] = epoch
+            if not isinstance(timeseries, TimeSeries) and epoch is None:
+                raise TypeError(f'Invalid type: {timeseries}')
+            elif epoch is not None and isinstance(timeseries, np.ndarray):
+                value = timeseries
+                if fs is None:
+                    deltax = self.deltax
                 else:
-                    self._array = np.insert(self._array, idx_insert, value, axis=0)
-                    self._epoch = np.insert(self._epoch, idx_insert, epoch)
-                    self._y = np.insert(self._y, idx_insert, freq)
-        else:
-            self._array = value.reshape(1, size)
-            self._epoch = np.array([epoch])
-            self._y = np.array([freq])
-            self._deltax = deltax
-            self._isempty = False
+                    deltax = 1./fs
+                size = value.size
+            else:
+                value = timeseries.value
+                epoch = timeseries.epoch
+                deltax = timeseries.deltax
+                size = timeseries.size
+
+            if not self._isempty:
+                if size != self.xsize:
+                    raise Exception(f'Incompatible size: {timeseries.size} != {self.xsize}')
+                if deltax != self.deltax:
+                    raise Exception(f'Incompatible deltax: {timeseries.deltax} != {self.deltax}')
+                value = np.asarray(value, dtype = self._array.dtype)
+                if self._nrows == self._capacity:
+                    self._grow()
+            else:
+                self._alloc(value, freq)
+                self._deltax = deltax
+                self._isempty = False
+        self._nrows = insert_sorted(self._arraybuf, self._ybuf, self._epochbuf, self._nrows,
+                                    value, freq, epoch)
+        self._sync()
 
     def interpolate(self, t_interp):
-        ret = np.zeros([self.ysize, len(t_interp)], self._array.dtype)
-        for i, epoch in enumerate(self.epoch):
-            ret[i,:] = np.interp(t_interp, self.x + epoch, self._array[i,:])
+        # Linear interpolation of all rows at once, clamped at the edges as np.interp
+        # in blocks of INTERP_BLOCK_ROWS rows to bound the temporaries
+        freqs, epoch, array = self.as_arrays()
+        t_interp = np.asarray(t_interp)
+        nx = self.xsize
+        ret = np.empty((self.ysize, t_interp.size),
+                       dtype = np.result_type(array, epoch, t_interp, float))
+        for start in range(0, self.ysize, INTERP_BLOCK_ROWS):
+            stop = min(start + INTERP_BLOCK_ROWS, self.ysize)
+            pos = (t_interp[np.newaxis,:] - epoch[start:stop,np.newaxis]) / self._deltax
+            np.clip(pos, 0, nx - 1, out = pos)
+            idx = np.minimum(pos.astype(int), max(nx - 2, 0))
+            pos -= idx
+            rows = np.arange(start, stop)[:,np.newaxis]
+            out = ret[start:stop]
+            np.multiply(array[rows, idx], 1 - pos, out = out)
+            if nx > 1:
+                out += array[rows, idx + 1] * pos
         return ret
 
     def get_finterp(self, pset = None):
@@ -493,13 +801,15 @@ class TimeFreqSpectrum(MultiSeries):
     def calc_trace_val(self, track_x, track_y, max_search = 5):
         ret = []
         freqs = []
-        for i,freq in enumerate(self.frequencies):
+        for freq, epoch, row in self.iter_rows():
             if freq < track_y[0] or freq > track_y[-1]:
                 continue
-            gps = track_x[get_idx(track_y, freq)]
-            times = self.epoch[i] + self.x
-            idxes = np.where( np.abs(times - gps) < max_search/freq )[0]
-            ret.append(np.max(self._array[i, idxes]))
+            # Samples with |epoch + x - gps| < max_search/freq, x is sorted
+            tgps = track_x[get_idx(track_y, freq)] - epoch
+            dt = max_search / freq
+            idx_start = np.searchsorted(self.x, tgps - dt, side = 'right')
+            idx_end = np.searchsorted(self.x, tgps + dt, side = 'left')
+            ret.append(np.max(row[idx_start:idx_end]))
             freqs.append(freq)
         return np.asarray(ret), np.asarray(freqs)
 
@@ -600,6 +910,76 @@ class TimeFreqSpectrum(MultiSeries):
 
 
 
+def resample_many(tseries_list, fs_new):
+    """
+    Resample TimeSeries of the same fs and length in one polyphase call.
+    """
+    tseries_list = list(tseries_list)
+    if len(tseries_list) == 0:
+        return []
+    deltax = tseries_list[0].deltax
+    if any(ts.deltax != deltax for ts in tseries_list):
+        raise ValueError(f'Inputs must share sample rate: {[1./ts.deltax for ts in tseries_list]}')
+    fs = 1./deltax
+    if fs_new == fs:
+        return tseries_list
+    stack = np.stack([ts.value for ts in tseries_list])
+    new = resample(stack, fs, fs_new, axis = 1).astype(stack.dtype, copy = False)
+    return [TimeSeries(new[i], epoch = ts.epoch, fs = fs_new, info = ts._info)
+            for i, ts in enumerate(tseries_list)]
+
+def _is_row_of(value, array):
+    return isinstance(value, np.ndarray) and value.dtype == array.dtype and \
+        value.ndim == 1 and value.shape[0] == array.shape[1]
+
+def _asarray(value, dtype):
+    if dtype is None:
+        value = np.asarray(value)
+        if value.dtype.kind not in 'fc':
+            value = value.astype(np.result_type(value.dtype, DEFAULT_REAL_DTYPE))
+        return value
+    if isinstance(dtype, str) and dtype == 'single':
+        if np.iscomplexobj(value):
+            dtype = DEFAULT_COMPLEX_DTYPE
+        else:
+            dtype = DEFAULT_REAL_DTYPE
+    return np.ascontiguousarray(value, dtype = dtype)
+
+def _merge_order(y_old, y_new):
+    """
+    Sorting permutation of concatenate([y_old, y_new]),
+    duplicated y keep the last one.
+    """
+    if y_old is None:
+        ys = y_new
+    else:
+        ys = np.concatenate([y_old, y_new])
+    perm = np.argsort(ys, kind = 'stable')
+    ysorted = ys[perm]
+    keep = np.append(ysorted[1:] != ysorted[:-1], True)
+    return perm[keep]
+
+def _label_dtype(old, new):
+    # y and epoch buffers are at least float, so later labels are not truncated
+    if old is None:
+        return np.result_type(new, float)
+    return np.result_type(old, new, float)
+
+def _take_rows(old, new, perm, order = 'C', dtype = None):
+    """
+    Rows perm of concatenate([old, new]) without building the concatenation.
+    """
+    if old is None:
+        return np.asarray(new[perm], dtype = dtype, order = order)
+    if dtype is None:
+        dtype = old.dtype
+    nold = len(old)
+    ret = np.empty((perm.size,) + old.shape[1:], dtype = dtype, order = order)
+    isold = perm < nold
+    ret[isold] = old[perm[isold]]
+    ret[~isold] = new[perm[~isold] - nold]
+    return ret
+
 def track_wrapper(track_x, track_y, gps, limit_start, limit_end):
     track_x = track_x + gps
     ini = track_x[0]
@@ -6,7 +6,7 @@ Writer: Shallyn(shallyn.liu@foxmail.com)
 import numpy as np
 from . import TimeSeries, TimeFreqSpectrum
 from .detector import Detector
-from .._core.filter import padinsert, cutinsert, correlate_real, get_psdfun
+from .._core.filter import padinsert, cutinsert, correlate_real, get_psdfun, fft
 from .._core import resample
 from scipy import signal
 from scipy.interpolate import InterpolatedUnivariateSpline
@@ -24,8 +24,8 @@ def get_sigma2(ifo):
 #-----------------------My Strain Series Class--------------------#
 # Must be real series
 class gwStrain(TimeSeries):
-    def __init__(self, strain, epoch, ifo, fs, info = ''):
-        super(gwStrain, self).__init__(value = strain, epoch = epoch, fs = fs, info = info)
+    def __init__(self, strain, epoch, ifo, fs, info = '', dtype = None):
+        super(gwStrain, self).__init__(value = strain, epoch = epoch, fs = fs, info = info, dtype = dtype)
         self._ifo = ifo
         Det = Detector(self._ifo)
         self._ifo_latitude = Det.latitude
@@ -87,7 +87,7 @@ class gwStrain(TimeSeries):
     def resample(self, fs):
         if fs != self.fs:
             new = resample(self.value, self.fs, fs)
-            return gwStrain(new, self.epoch, self.ifo, fs, info = self._info)
+            return gwStrain(new, self.epoch, self.ifo, fs, info = self._info, dtype = self._value.dtype)
         else:
             return self
     
@@ -144,6 +144,7 @@ class gwStrain(TimeSeries):
         stilde, hrtilde, hitilde, power_vec = self.rfft_utils(tmpl, psd, cut, window)        
         outspec = CreateEmptySpectrum(self.ifo)
         df = self.fs / self.size
+        snrs, freqs, epochs = [], [], []
         for (shift, qtile) in tmpl.iter_fftQPlane(q = q, 
                                                   duration = self.duration,
                                                   fs = self.fs,
@@ -154,8 +155,10 @@ class gwStrain(TimeSeries):
             hiwindowed = hitilde * qwindow
             snr_r = correlate_real(stilde, hrwindowed, power_vec, df)
             snr_i = correlate_real(stilde, hiwindowed, power_vec, df)
-            snr = snr_r + 1.j*snr_i
-            outspec.append(snr, freq, epoch=self.epoch+shift, fs=self.fs)
+            snrs.append(snr_r + 1.j*snr_i)
+            freqs.append(qtile.frequency)
+            epochs.append(self.epoch + shift)
+        outspec.extend(snrs, freqs, epochs, fs=self.fs)
         return outspec
 
     def rfft_utils(self,
@@ -184,9 +187,9 @@ class gwStrain(TimeSeries):
             dwindow = 1
             
         fs = self.fs
-        stilde = np.fft.rfft(s * dwindow)
-        hrtilde = np.fft.rfft(h.real * dwindow)
-        hitilde = np.fft.rfft(h.imag * dwindow)
+        stilde = fft.rfft(s * dwindow)
+        hrtilde = fft.rfft(h.real * dwindow)
+        hitilde = fft.rfft(h.imag * dwindow)
         datafreq = np.fft.rfftfreq(h.size, 1./fs)
         df = abs(datafreq[1] - datafreq[0])
         power_vec = psdfun(np.abs(datafreq))